@@ -1,5 +1,11 @@
 """
 Utilitários para análise exploratória de dados do perfil de vento.
+
+As funções de plot criam uma figura nova apenas quando ax não é informado.
+Em laços que geram muitos gráficos (animações, lotes de imagens), crie o eixo
+uma vez e passe-o a cada chamada, limpando-o com ax.cla() entre iterações
+(plot_heatmap_by_height_time adiciona uma barra de cores à figura a cada chamada;
+nesse caso limpe a figura inteira com fig.clf() e crie o eixo novamente).
 """
 
 import numpy as np
@@ -10,11 +16,16 @@ import matplotlib.dates as mdates
 from matplotlib.colors import LinearSegmentedColormap
 from typing import List, Dict, Tuple, Optional, Union
 import warnings
-from scipy import stats
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import database_exists, create_database
 
+# Formato do campo id no CSV (ex: '2021-09-16 18:10:00', frações de segundo removidas)
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 # Configuração de estilo para visualizações
 def set_plotting_style():
     """
@@ -45,35 +56,145 @@ def load_wind_data(file_path: str) -> pd.DataFrame:
     Returns:
         DataFrame com os dados carregados e pré-processados
     """
-    # Carregar dados
-    df = pd.read_csv(file_path)
+    # Carregar dados (leitor multithread do pyarrow quando disponível)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        df = pd.read_csv(file_path, dtype={'id': str})
+    else:
+        # O tipo string precisa ser informado ao próprio pyarrow; com engine='pyarrow' do
+        # pandas o id seria lido como timestamp e reescrito antes da conversão de dtype
+        convert_options = pa_csv.ConvertOptions(column_types={'id': pa.string()})
+        df = pa_csv.read_csv(file_path, convert_options=convert_options).to_pandas()
+    
+    # Medições têm precisão de ~0.01, portanto float32 é suficiente e reduz pela metade a memória
+    float_cols = df.select_dtypes('float64').columns
+    df = df.astype({col: 'float32' for col in float_cols})
     
     # Processar o campo id para extrair datetime
-    # Primeiro, converte para string e separa a parte antes do ponto (removendo frações de segundo)
-    df['id_str'] = df['id'].astype(str).apply(lambda x: x.split('.')[0])
-    # Converte para datetime
-    df['id_datetime'] = pd.to_datetime(df['id_str'], errors='coerce')
-    # Configura o datetime como índice
-    df.set_index('id_datetime', inplace=True)
-    # Remove a coluna intermediária
-    df.drop(columns=['id_str'], inplace=True)
-    
-    # Verificar dados ausentes
-    missing_data = df.isnull().sum()
-    if missing_data.sum() > 0:
+    # Primeiro, separa a parte antes do ponto (removendo frações de segundo) de forma vetorizada
+    id_str = df['id'].astype(str).str.split('.', n=1).str[0]
+    # Converte para datetime com formato explícito (evita a inferência linha a linha)
+    # e configura o datetime como índice (sem inserir uma coluna intermediária no DataFrame)
+    df.index = pd.DatetimeIndex(pd.to_datetime(id_str, format=DATETIME_FORMAT, errors='coerce', cache=True),
+                                name='id_datetime')
+    
+    # Verificar dados ausentes (o resumo por coluna só é calculado se houver algum)
+    if df.isna().to_numpy().any():
+        missing_data = df.isna().sum()
         print(f"Dados ausentes encontrados:\n{missing_data[missing_data > 0]}")
         # Opção para lidar com valores ausentes (pode ser ajustada conforme necessidade)
-        df = df.interpolate(method='time')
+        df = _interpolate_time(df)
+    
+    # Atributos de calendário não são armazenados; use time_features(df) quando necessário
+    return df
+
+def time_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula sob demanda atributos de calendário a partir do índice datetime.
     
-    # Adicionar colunas adicionais úteis para análise
-    df['hour_of_day'] = df.index.hour
-    df['day_of_week'] = df.index.dayofweek
-    df['month'] = df.index.month
-    df['day'] = df.index.day
-    df['year'] = df.index.year
+    Args:
+        df: DataFrame indexado por datetime
+        
+    Returns:
+        DataFrame com as colunas 'hour_of_day', 'day_of_week', 'month', 'day'
+        e 'year', alinhado ao índice de df
+    """
+    idx = df.index
+    return pd.DataFrame({
+        'hour_of_day': idx.hour.astype('int8'),
+        'day_of_week': idx.dayofweek.astype('int8'),
+        'month': idx.month.astype('int8'),
+        'day': idx.day.astype('int8'),
+        'year': idx.year.astype('int16'),
+    }, index=idx)
+
+def _interpolate_time(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Interpola linearmente no tempo os valores ausentes das colunas numéricas.
     
+    Equivale a df.interpolate(method='time'), mas opera diretamente sobre o
+    array NumPy, coluna a coluna, evitando o custo do kernel do pandas em
+    DataFrames largos.
+    
+    Args:
+        df: DataFrame indexado por datetime
+        
+    Returns:
+        DataFrame com os valores ausentes interpolados
+    """
+    numeric_cols = df.select_dtypes(np.number).columns
+    arr = df[numeric_cols].to_numpy(dtype=np.float64, copy=True)
+    mask = np.isnan(arr)
+    # Apenas colunas com valores ausentes são reescritas (preserva o dtype das demais)
+    missing = np.flatnonzero(mask.any(axis=0))
+    numeric_cols = numeric_cols[missing]
+    arr = arr[:, missing]
+    mask = mask[:, missing]
+    # Posições temporais em nanossegundos; para amostragem regular equivale à interpolação linear
+    x = df.index.asi8.astype(np.float64)
+    
+    for j in range(arr.shape[1]):
+        bad = mask[:, j]
+        good_idx = np.flatnonzero(~bad)
+        if len(good_idx) == 0:
+            continue
+        # Assim como no pandas, valores ausentes antes do primeiro valor válido são mantidos
+        bad_idx = np.flatnonzero(bad)
+        bad_idx = bad_idx[bad_idx > good_idx[0]]
+        # np.interp exige xp crescente; ordena os pontos válidos como o pandas (índice não monotônico)
+        order = np.argsort(x[good_idx], kind='stable')
+        arr[bad_idx, j] = np.interp(x[bad_idx], x[good_idx][order], arr[good_idx[order], j])
+    
+    df = df.copy()
+    df[numeric_cols] = pd.DataFrame(arr, index=df.index, columns=numeric_cols).astype(df.dtypes[numeric_cols])
     return df
 
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Seleciona pontos de uma série pelo algoritmo Largest-Triangle-Three-Buckets (LTTB).
+    
+    Reduz a série a n_out pontos preservando sua forma visual: o primeiro e o
+    último ponto são mantidos e, em cada bucket intermediário, escolhe-se o
+    ponto que forma o maior triângulo com o ponto anterior selecionado e a
+    média do bucket seguinte.
+    
+    Args:
+        x: Valores do eixo x (crescentes)
+        y: Valores do eixo y, sem NaN
+        n_out: Número de pontos desejado
+        
+    Returns:
+        Array com os índices (posições) dos pontos selecionados
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # Limites dos n_out - 2 buckets intermediários (primeiro e último ponto são fixos)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Média do próximo bucket (ou último ponto, no bucket final)
+        if i < n_out - 3:
+            nxt_x = x[stop:edges[i + 2]].mean()
+            nxt_y = y[stop:edges[i + 2]].mean()
+        else:
+            nxt_x, nxt_y = x[n - 1], y[n - 1]
+        
+        area = np.abs((x[prev] - nxt_x) * (y[start:stop] - y[prev])
+                      - (x[prev] - x[start:stop]) * (nxt_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        out[i + 1] = prev
+    
+    return out
+
 def get_height_columns(df: pd.DataFrame, prefix: str) -> List[str]:
     """
     Extrai as colunas que correspondem a uma determinada variável em diferentes alturas.
@@ -85,11 +206,18 @@ def get_height_columns(df: pd.DataFrame, prefix: str) -> List[str]:
     Returns:
         Lista de nomes de colunas ordenadas por altura
     """
-    cols = [col for col in df.columns if col.startswith(prefix)]
+    return list(_height_cols_cached(tuple(df.columns), prefix))
+
+@lru_cache(maxsize=128)
+def _height_cols_cached(cols_tuple: Tuple[str, ...], prefix: str) -> Tuple[str, ...]:
+    """
+    Versão memoizada da busca de colunas por altura, chaveada pelas colunas do DataFrame.
+    """
+    cols = [col for col in cols_tuple if col.startswith(prefix)]
     # Extrair a altura de cada coluna e ordenar
-    heights = [int(col.replace(prefix, '')) for col in cols]
-    sorted_cols = [x for _, x in sorted(zip(heights, cols))]
-    return sorted_cols
+    heights = np.fromiter((int(c[len(prefix):]) for c in cols), dtype=np.int32, count=len(cols))
+    order = np.argsort(heights, kind='stable')
+    return tuple(cols[i] for i in order)
 
 def extract_heights(columns: List[str], prefix: str) -> List[int]:
     """
@@ -102,12 +230,38 @@ def extract_heights(columns: List[str], prefix: str) -> List[int]:
     Returns:
         Lista de alturas como inteiros
     """
-    heights = [int(col.replace(prefix, '')) for col in columns]
-    return sorted(heights)
+    return list(_heights_cached(tuple(columns), prefix))
+
+@lru_cache(maxsize=128)
+def _heights_cached(columns: Tuple[str, ...], prefix: str) -> Tuple[int, ...]:
+    """
+    Versão memoizada da extração de alturas a partir dos nomes de colunas.
+    """
+    return tuple(sorted(int(col[len(prefix):]) for col in columns))
+
+def make_profile_accessor(df: pd.DataFrame, prefix: str) -> Tuple[List[int], np.ndarray, Dict]:
+    """
+    Pré-extrai os perfis de uma variável para acesso rápido por timestamp.
+    
+    Útil em laços (animações, dashboards) que plotam muitos perfis do mesmo
+    DataFrame: evita a indexação por rótulo do pandas a cada chamada.
+    
+    Args:
+        df: DataFrame com os dados
+        prefix: Prefixo das colunas (ex: 'ws', 'wdir', 'verts')
+        
+    Returns:
+        Tupla (alturas, matriz de valores (N_tempos, N_alturas), mapa timestamp -> linha)
+    """
+    columns = get_height_columns(df, prefix)
+    heights = extract_heights(columns, prefix)
+    values_array = df[columns].to_numpy()
+    idx_map = {ts: i for i, ts in enumerate(df.index)}
+    return heights, values_array, idx_map
 
 def plot_vertical_profile(df: pd.DataFrame, timestamp, variable_prefix: str, 
                           title: str, xlabel: str, add_stats: bool = False,
-                          ax=None, color=None):
+                          ax=None, color=None, accessor=None):
     """
     Plota o perfil vertical de uma variável para um timestamp específico.
     
@@ -120,17 +274,29 @@ def plot_vertical_profile(df: pd.DataFrame, timestamp, variable_prefix: str,
         add_stats: Se True, adiciona estatísticas ao gráfico
         ax: Eixo matplotlib opcional para o plot
         color: Cor opcional para a linha
+        accessor: Resultado opcional de make_profile_accessor(df, variable_prefix),
+            recomendado ao plotar muitos perfis em sequência
     """
     if ax is None:
         _, ax = plt.subplots(figsize=(8, 10))
-        
-    columns = get_height_columns(df, variable_prefix)
-    heights = extract_heights(columns, variable_prefix)
     
     # Obter valores para o timestamp específico
-    if timestamp in df.index:
-        values = df.loc[timestamp, columns].values
-        
+    if accessor is not None:
+        heights, values_array, idx_map = accessor
+        row_idx = idx_map.get(timestamp)
+        if row_idx is None:
+            # Aceita também strings de data; valores não interpretáveis seguem para o aviso abaixo
+            try:
+                row_idx = idx_map.get(pd.Timestamp(timestamp))
+            except (ValueError, TypeError):
+                row_idx = None
+        values = values_array[row_idx] if row_idx is not None else None
+    else:
+        columns = get_height_columns(df, variable_prefix)
+        heights = extract_heights(columns, variable_prefix)
+        values = df.loc[timestamp, columns].values if timestamp in df.index else None
+    
+    if values is not None:
         # Plotar o perfil vertical
         if color:
             ax.plot(values, heights, marker='o', linestyle='-', linewidth=2, markersize=6, color=color)
@@ -157,9 +323,62 @@ def plot_vertical_profile(df: pd.DataFrame, timestamp, variable_prefix: str,
         warnings.warn(f"Timestamp {timestamp} não encontrado no DataFrame.")
         return ax
 
+def _format_time_axis(ax):
+    """
+    Formata o eixo x de datas apenas no eixo informado (sem alterar o estado global do pyplot).
+    """
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(ax.xaxis.get_major_locator()))
+    ax.tick_params(axis='x', rotation=45)
+
+# Cache LRU de agregações por DataFrame: (id(df), chave) -> (referência fraca ao df, resultado)
+_df_cache: OrderedDict[Tuple, Tuple] = OrderedDict()
+_DF_CACHE_MAX = 16
+
+def _cached_for_df(df: pd.DataFrame, key: Tuple, build, cache: bool = True):
+    """
+    Memoiza build() para o DataFrame df sob a chave informada (se cache for True).
+    
+    Uma referência fraca ao DataFrame garante que um id reutilizado não
+    devolva dados de outro objeto. Modificações in-place no DataFrame não são
+    detectadas; nesse caso chame clear_resample_cache().
+    """
+    if not cache:
+        return build()
+    
+    full_key = (id(df),) + key
+    cached = _df_cache.get(full_key)
+    if cached is not None and cached[0]() is df:
+        _df_cache.move_to_end(full_key)
+        return cached[1]
+    
+    result = build()
+    # Remover entradas de DataFrames que já foram coletados
+    for stale in [k for k, (ref, _) in _df_cache.items() if ref() is None]:
+        del _df_cache[stale]
+    _df_cache[full_key] = (weakref.ref(df), result)
+    # Descartar as entradas usadas há mais tempo além do limite
+    while len(_df_cache) > _DF_CACHE_MAX:
+        _df_cache.popitem(last=False)
+    return result
+
+def _resample_mean(df: pd.DataFrame, rule: str, columns, cache: bool = False) -> pd.DataFrame:
+    """
+    Média reamostrada de df[columns] segundo a regra, opcionalmente memoizada por DataFrame.
+    """
+    columns = list(columns)
+    return _cached_for_df(df, ('resample', rule, tuple(columns)),
+                          lambda: df[columns].resample(rule).mean(), cache=cache)
+
+def clear_resample_cache():
+    """
+    Descarta as agregações em cache (use após modificar o DataFrame).
+    """
+    _df_cache.clear()
+
 def plot_time_series(df: pd.DataFrame, column: str, title: str = None, 
                      ylabel: str = None, resample: str = None, 
-                     plot_type: str = 'line', ax=None):
+                     plot_type: str = 'line', ax=None, max_points: int = None,
+                     backend: str = 'matplotlib', cache: bool = False):
     """
     Plota uma série temporal para uma coluna específica.
     
@@ -171,14 +390,37 @@ def plot_time_series(df: pd.DataFrame, column: str, title: str = None,
         resample: Regra de reamostragem (ex: 'H' para hora, 'D' para dia)
         plot_type: Tipo de plot ('line', 'scatter', ou 'box')
         ax: Eixo matplotlib opcional para o plot
+        max_points: Número máximo de pontos desenhados em 'line' e 'scatter';
+            séries maiores são reduzidas com LTTB (opcional)
+        backend: 'matplotlib' (padrão) ou 'plotly' para um gráfico interativo
+            via plot_time_series_fast (apenas plot_type='line', sem ax nem max_points)
+        cache: Se True, reaproveita a média reamostrada entre chamadas com o mesmo
+            DataFrame; após modificá-lo in-place, chame clear_resample_cache()
+            para não plotar dados desatualizados
         
     Returns:
-        Eixo matplotlib com o plot
+        Eixo matplotlib com o plot, ou a figura FigureResampler se backend='plotly'
     """
+    if backend == 'plotly':
+        if plot_type != 'line':
+            raise ValueError("O backend 'plotly' suporta apenas plot_type='line'")
+        if ax is not None or max_points is not None:
+            raise ValueError("O backend 'plotly' não aceita ax nem max_points "
+                             "(a redução de pontos é feita dinamicamente pelo plotly-resampler)")
+        return plot_time_series_fast(df, column, title=title, ylabel=ylabel, resample=resample,
+                                     cache=cache)
+    elif backend != 'matplotlib':
+        raise ValueError(f"Backend desconhecido: {backend}")
+    
     if ax is None:
         _, ax = plt.subplots(figsize=(14, 6))
         
-    data = df[column] if resample is None else df[column].resample(resample).mean()
+    data = df[column] if resample is None else _resample_mean(df, resample, [column], cache)[column]
+    
+    if max_points is not None and plot_type != 'box' and len(data) > max_points:
+        data = data.dropna()
+        idx = lttb_indices(data.index.asi8.astype(np.float64), data.to_numpy(dtype=np.float64), max_points)
+        data = data.iloc[idx]
     
     if plot_type == 'line':
         ax.plot(data.index, data.values, linewidth=2)
@@ -187,10 +429,14 @@ def plot_time_series(df: pd.DataFrame, column: str, title: str = None,
     elif plot_type == 'box':
         if resample is None:
             raise ValueError("Para boxplot, é necessário especificar resample")
-        df_resampled = df.resample(resample).agg({column: list})
-        box_data = [x for x in df_resampled[column] if len(x) > 0]
-        ax.boxplot(box_data)
-        ax.set_xticklabels([pd.to_datetime(d).strftime('%Y-%m-%d') for d in df_resampled.index])
+        # Estatísticas do boxplot calculadas diretamente por intervalo (sem listas Python)
+        box_stats = df[column].groupby(pd.Grouper(freq=resample)).describe()
+        box_stats = box_stats[box_stats['count'] > 0]
+        bxpstats = [{'med': row['50%'], 'q1': row['25%'], 'q3': row['75%'],
+                     'whislo': row['min'], 'whishi': row['max'],
+                     'label': d.strftime('%Y-%m-%d')}
+                    for d, row in box_stats.iterrows()]
+        ax.bxp(bxpstats, showfliers=False)
         ax.tick_params(axis='x', rotation=45)
         
     if title:
@@ -203,11 +449,41 @@ def plot_time_series(df: pd.DataFrame, column: str, title: str = None,
     
     # Formatação de data no eixo x
     if plot_type != 'box':
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.xticks(rotation=45)
+        _format_time_axis(ax)
     
     return ax
 
+def plot_time_series_fast(df: pd.DataFrame, column: str, title: str = None,
+                          ylabel: str = None, resample: str = None, cache: bool = False):
+    """
+    Plota uma série temporal interativa com reamostragem dinâmica (plotly-resampler).
+    
+    Apenas os pontos agregados (LTTB) da faixa visível são enviados ao navegador,
+    o que mantém o gráfico responsivo mesmo com milhões de amostras.
+    
+    Args:
+        df: DataFrame com os dados
+        column: Coluna a ser plotada
+        title: Título do gráfico (opcional)
+        ylabel: Etiqueta do eixo y (opcional)
+        resample: Regra de reamostragem (ex: 'H' para hora, 'D' para dia)
+        cache: Se True, reaproveita a média reamostrada entre chamadas
+            (veja plot_time_series)
+        
+    Returns:
+        Figura FigureResampler; exiba com fig.show_dash(mode='inline')
+    """
+    import plotly.graph_objects as go
+    from plotly_resampler import FigureResampler
+    
+    data = df[column] if resample is None else _resample_mean(df, resample, [column], cache)[column]
+    
+    fig = FigureResampler(go.Figure())
+    fig.add_trace(go.Scattergl(name=column, mode='lines'), hf_x=data.index, hf_y=data.to_numpy())
+    fig.update_layout(title=title, xaxis_title="Data", yaxis_title=ylabel)
+    
+    return fig
+
 def plot_wind_rose(df: pd.DataFrame, ws_col: str, wdir_col: str, 
                    title: str = None, bins_ws: int = 5, bins_dir: int = 16, ax=None):
     """
@@ -234,9 +510,9 @@ def plot_wind_rose(df: pd.DataFrame, ws_col: str, wdir_col: str,
         fig.add_axes(ax)
     
     # Remover valores NaN
-    mask = ~(df[ws_col].isna() | df[wdir_col].isna())
-    ws_data = df.loc[mask, ws_col]
-    wdir_data = df.loc[mask, wdir_col]
+    sub = df[[ws_col, wdir_col]].dropna()
+    ws_data = sub[ws_col].to_numpy()
+    wdir_data = sub[wdir_col].to_numpy()
     
     # Plotar rosa dos ventos
     ax.bar(wdir_data, ws_data, normed=True, opening=0.8, 
@@ -249,9 +525,29 @@ def plot_wind_rose(df: pd.DataFrame, ws_col: str, wdir_col: str,
     
     return ax
 
+def _heatmap_data(df: pd.DataFrame, variable_prefix: str, resample: str, cache: bool = False):
+    """
+    Retorna (instantes, alturas, matriz altura x tempo) para o mapa de calor.
+    
+    A matriz é construída já transposta e contígua em float32; com cache=True,
+    uma única vez por combinação de DataFrame, prefixo e regra de reamostragem.
+    """
+    def build():
+        columns = get_height_columns(df, variable_prefix)
+        heights = extract_heights(columns, variable_prefix)
+        
+        # Reamostrar dados para reduzir a dimensionalidade temporal
+        # (sem cachear o DataFrame intermediário, para não manter uma segunda cópia)
+        df_resampled = df[columns].resample(resample).mean()
+        data = np.ascontiguousarray(df_resampled.to_numpy(dtype=np.float32).T)
+        return df_resampled.index, heights, data
+    
+    return _cached_for_df(df, ('heatmap', variable_prefix, resample), build, cache=cache)
+
 def plot_heatmap_by_height_time(df: pd.DataFrame, variable_prefix: str, 
                                title: str, cmap: str = 'viridis', 
-                               resample: str = 'D', ax=None):
+                               resample: str = 'D', ax=None, max_points: int = None,
+                               cache: bool = False):
     """
     Plota um mapa de calor de uma variável por altura e tempo.
     
@@ -262,28 +558,37 @@ def plot_heatmap_by_height_time(df: pd.DataFrame, variable_prefix: str,
         cmap: Colormap para o mapa de calor
         resample: Regra de reamostragem (ex: 'D' para dia)
         ax: Eixo matplotlib opcional para o plot
+        max_points: Número máximo de colunas (instantes) no mapa de calor;
+            intervalos excedentes são agregados pela média (opcional)
+        cache: Se True, reaproveita a matriz reamostrada entre chamadas com o mesmo
+            DataFrame; após modificá-lo in-place, chame clear_resample_cache()
+            para não plotar dados desatualizados
     """
     if ax is None:
         _, ax = plt.subplots(figsize=(14, 8))
     
-    columns = get_height_columns(df, variable_prefix)
-    heights = extract_heights(columns, variable_prefix)
-    
-    # Reamostrar dados para reduzir a dimensionalidade temporal
-    df_resampled = df[columns].resample(resample).mean()
+    times, heights, data = _heatmap_data(df, variable_prefix, resample, cache)
     
-    # Preparar dados para o mapa de calor
-    data = df_resampled.T.values
+    # Agregar instantes consecutivos em blocos se o eixo temporal exceder max_points
+    if max_points is not None and len(times) > max_points:
+        buckets = np.arange(len(times)) * max_points // len(times)
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        valid = ~np.isnan(data)
+        sums = np.add.reduceat(np.where(valid, data, 0), starts, axis=1)
+        counts = np.add.reduceat(valid, starts, axis=1)
+        with np.errstate(invalid='ignore'):
+            data = (sums / counts).astype(np.float32)
+        times = times[starts]
     
     # Plotar mapa de calor
     im = ax.imshow(data, aspect='auto', cmap=cmap, origin='lower', 
-                   extent=[0, len(df_resampled), heights[0], heights[-1]])
+                   extent=[0, len(times), heights[0], heights[-1]])
     
     # Configurar ticks e labels
-    num_time_ticks = min(10, len(df_resampled))
-    time_indices = np.linspace(0, len(df_resampled) - 1, num_time_ticks, dtype=int)
+    num_time_ticks = min(10, len(times))
+    time_indices = np.linspace(0, len(times) - 1, num_time_ticks, dtype=int)
     ax.set_xticks(time_indices)
-    ax.set_xticklabels([df_resampled.index[i].strftime('%Y-%m-%d') for i in time_indices], rotation=45)
+    ax.set_xticklabels([times[i].strftime('%Y-%m-%d') for i in time_indices], rotation=45)
     
     # Configurar labels e título
     ax.set_ylabel("Altura (m)", fontsize=12)
@@ -299,7 +604,8 @@ def create_database_connection(db_name: str = 'DataSet-PerfilVento',
                               user: str = 'root',
                               password: str = 'root',
                               host: str = 'localhost',
-                              port: str = '5432'):
+                              port: str = '5432',
+                              pool_size: int = 8):
     """
     Cria uma conexão com o banco de dados PostgreSQL.
     
@@ -309,12 +615,14 @@ def create_database_connection(db_name: str = 'DataSet-PerfilVento',
         password: Senha
         host: Host do banco de dados
         port: Porta do banco de dados
+        pool_size: Número de conexões mantidas no pool
         
     Returns:
         Engine do SQLAlchemy para conexão com o banco de dados
     """
     # Configurar string de conexão
-    db_url = f'postgresql://{user}:{password}@{host}:{port}/{db_name}'
+    # (driver psycopg2 explícito: executemany_mode é uma opção específica dele)
+    db_url = f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{db_name}'
     
     # Verificar se o banco de dados existe e criar se não existir
     if not database_exists(db_url):
@@ -323,11 +631,36 @@ def create_database_connection(db_name: str = 'DataSet-PerfilVento',
     else:
         print(f"Banco de dados '{db_name}' já existe.")
     
-    # Criar engine
-    engine = create_engine(db_url)
+    # Criar engine com pool de conexões e inserções em lote (múltiplas linhas por INSERT)
+    engine = create_engine(db_url,
+                           pool_pre_ping=True,
+                           pool_size=pool_size,
+                           max_overflow=2 * pool_size,
+                           executemany_mode='values_plus_batch',
+                           insertmanyvalues_page_size=10000)
     
     return engine
 
+def bulk_insert(df: pd.DataFrame, table: str, engine, chunksize: int = 10000,
+                if_exists: str = 'append') -> int:
+    """
+    Insere um DataFrame em uma tabela do banco de dados em lotes.
+    
+    Args:
+        df: DataFrame com os dados
+        table: Nome da tabela de destino
+        engine: Engine do SQLAlchemy (ex: retornada por create_database_connection)
+        chunksize: Número de linhas enviadas por lote
+        if_exists: Comportamento se a tabela já existir ('fail', 'replace' ou 'append')
+        
+    Returns:
+        Número de linhas inseridas
+    """
+    # O executemany padrão já usa o caminho rápido configurado na engine (VALUES em lote);
+    # method='multi' esbarraria no limite de parâmetros do PostgreSQL com tabelas largas
+    df.to_sql(table, engine, if_exists=if_exists, chunksize=chunksize)
+    return len(df)
+
 def windspeed_profile_law(height, reference_height, reference_speed, alpha=0.143):
     """
     Calcula o perfil de velocidade do vento usando a lei de potência.
@@ -343,6 +676,26 @@ def windspeed_profile_law(height, reference_height, reference_speed, alpha=0.143
     """
     return reference_speed * (height / reference_height) ** alpha
 
+def windspeed_profile_law_batch(heights, reference_height, reference_speeds, alpha=0.143):
+    """
+    Calcula perfis de velocidade pela lei de potência para vários instantes de uma vez.
+    
+    Args:
+        heights: Alturas do perfil (N_alturas,)
+        reference_height: Altura de referência
+        reference_speeds: Velocidades na altura de referência (N_tempos,); um escalar
+            resulta em uma única linha
+        alpha: Expoente da lei de potência, escalar ou um por instante (N_tempos,)
+        
+    Returns:
+        Matriz float32 (N_tempos, N_alturas) com as velocidades estimadas
+    """
+    ratio = np.asarray(heights, dtype=np.float64) / reference_height
+    reference_speeds = np.atleast_1d(np.asarray(reference_speeds, dtype=np.float64))
+    # Com alpha escalar a potência é calculada uma única vez por altura
+    factor = ratio ** np.asarray(alpha, dtype=np.float64)[..., np.newaxis]
+    return (reference_speeds[:, np.newaxis] * factor).astype(np.float32)
+
 def calculate_wind_shear_exponent(heights, speeds):
     """
     Calcula o expoente de cisalhamento do vento usando regressão linear no espaço log-log.
@@ -361,23 +714,72 @@ def calculate_wind_shear_exponent(heights, speeds):
     r_squared : float
         Coeficiente de determinação da regressão
     """
+    heights = np.asarray(heights, dtype=np.float64)
+    speeds = np.asarray(speeds, dtype=np.float64)
+    
     # Verificar valores negativos ou zero que causariam erros no logaritmo
-    valid_indices = []
-    for i, (height, speed) in enumerate(zip(heights, speeds)):
-        if height > 0 and speed > 0:
-            valid_indices.append(i)
+    valid = (heights > 0) & (speeds > 0)
     
-    if len(valid_indices) < 2:
+    if np.count_nonzero(valid) < 2:
         raise ValueError("Número insuficiente de pontos válidos para calcular o cisalhamento")
     
-    # Usar apenas valores válidos
-    valid_heights = np.array([heights[i] for i in valid_indices])
-    valid_speeds = np.array([speeds[i] for i in valid_indices])
+    log_heights = np.log(heights[valid])
+    log_speeds = np.log(speeds[valid])
+
+    # Regressão linear no espaço log-log (mínimos quadrados em forma fechada)
+    dh = log_heights - log_heights.mean()
+    ds = log_speeds - log_speeds.mean()
+    sxy = dh @ ds
+    sxx = dh @ dh
+    syy = ds @ ds
+    
+    if sxx == 0:
+        raise ValueError("Todas as alturas são iguais; não é possível calcular o cisalhamento")
+    
+    slope = sxy / sxx
+    r_squared = (sxy * sxy) / (sxx * syy) if syy > 0 else 0.0
     
-    log_heights = np.log(valid_heights)
-    log_speeds = np.log(valid_speeds)
+    return slope, r_squared
 
-    # Regressão linear no espaço log-log
-    slope, intercept, r_value, p_value, std_err = stats.linregress(log_heights, log_speeds)
+def calculate_wind_shear_exponent_batch(heights, speeds_2d):
+    """
+    Calcula o expoente de cisalhamento do vento para vários perfis de uma só vez.
+    
+    Parameters:
+    -----------
+    heights : list or array
+        Alturas de medição (N_alturas,), todas positivas
+    speeds_2d : array
+        Matriz de velocidades (N_tempos, N_alturas), um perfil por linha
+        
+    Returns:
+    --------
+    alpha : array
+        Expoente de cisalhamento de cada perfil (NaN se o perfil tiver
+        valores ausentes, nulos ou negativos)
+    r_squared : array
+        Coeficiente de determinação de cada regressão
+    """
+    heights = np.asarray(heights, dtype=np.float64)
+    speeds_2d = np.atleast_2d(np.asarray(speeds_2d, dtype=np.float64))
+    
+    if np.any(heights <= 0) or len(heights) < 2:
+        raise ValueError("As alturas devem ser positivas e conter ao menos dois pontos")
+    
+    # Termos que dependem apenas das alturas são calculados uma única vez
+    log_heights = np.log(heights)
+    dh = log_heights - log_heights.mean()
+    sxx = dh @ dh
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_speeds = np.log(np.where(speeds_2d > 0, speeds_2d, np.nan))
+        ds = log_speeds - log_speeds.mean(axis=1, keepdims=True)
+        sxy = ds @ dh
+        syy = np.einsum('ij,ij->i', ds, ds)
+        slopes = sxy / sxx
+        r_squared = np.where(syy > 0, sxy * sxy / (sxx * syy), 0.0)
+    
+    # Perfis inválidos propagam NaN também para o R²
+    r_squared[np.isnan(slopes)] = np.nan
     
-    return slope, r_value**2
+    return slopes, r_squared